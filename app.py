@@ -1,14 +1,62 @@
 # app.py
 
-from flask import Flask, render_template, request, redirect, url_for
-from core.ellipse_model import EllipseGenerator
+from flask import Flask, render_template, request, redirect, url_for, abort, send_from_directory
+from markupsafe import escape
+from core.ellipse_model import Fleet
 from core.collision_engine import CollisionDetector
-from services.rut_helper import extract_first8_digits
+from core.geometry_store import GeometryStore, pairwise_collisions
+from services.rut_helper import extract_first8_digits, parse_ruts_bulk
 from services.plot_service import build_2d_plot, build_3d_plot
-from services.adjustment_service import adjust_ellipses
+from services.static_plot_service import (
+    build_2d_image, build_3d_image, wait_for_image, record_page_images, page_images_available,
+    PLOTS_FOLDER, RENDER_TIMEOUT
+)
+from services.adjustment_service import adjust_ellipses, SearchBudget
+from services.http_cache import build_etag, not_modified, cached_response
+from services.config import load_config
 
 app = Flask(__name__)
 
+ADJUST_PROBES_PER_PAIR = load_config().get("simulation", {}).get("adjust_probes_per_pair", 4000)
+STATIC_PLOTS_MIN_DRONES = 10  # Desde este tamaño de flota se usan imágenes en vez de Plotly
+PARALLEL_COLLISIONS_MIN_DRONES = 10  # Desde aquí los pares se evalúan en el pool compartido
+
+
+def pair_collisions(ellipses: list) -> tuple[list[tuple[int, int]], list[bool]]:
+    n = len(ellipses)
+    pairs = [(i, j) for i in range(n) for j in range(i + 1, n)]
+    if n >= PARALLEL_COLLISIONS_MIN_DRONES:
+        with GeometryStore.create(ellipses) as store:
+            return pairs, pairwise_collisions(store, pairs)
+    return pairs, [CollisionDetector.detect_collision(ellipses[i], ellipses[j]) for i, j in pairs]
+
+
+def conflict_pairs(ellipses: list, budget: SearchBudget | None = None) -> list[tuple[int, int]]:
+    pairs, cols = pair_collisions(ellipses)
+    if budget is not None:
+        budget.spend(len(pairs))  # El barrido O(n²) también consume presupuesto
+    return [pair for pair, col in zip(pairs, cols) if col]
+
+
+def collision_table(ellipses: list) -> list[dict]:
+    pairs, cols = pair_collisions(ellipses)
+    return [
+        {
+            "i": i,
+            "j": j,
+            "colision": col,
+            "nivel": round(CollisionDetector.collision_risk_level(ellipses[i], ellipses[j]) * 100, 0)
+        }
+        for (i, j), col in zip(pairs, cols)
+    ]
+
+
+def static_plot_tag(filename: str, title: str) -> str:
+    return (
+        f'<img src="{url_for("serve_plot", filename=filename)}" '
+        f'alt="{escape(title)}" class="img-fluid" loading="lazy" />'
+    )
+
 
 @app.route("/", methods=["GET", "POST"])
 def index():
@@ -16,8 +64,7 @@ def index():
         raw_ruts = request.form.getlist("rut_list[]")
         case_type = request.form.get("case_type", "1")
 
-        clean_list = [''.join(filter(str.isdigit, r)) for r in raw_ruts]
-        if len(clean_list) < 2 or any(len(rc) < 8 for rc in clean_list) or case_type not in ("1", "2"):
+        if len(raw_ruts) < 2 or not parse_ruts_bulk(raw_ruts)[1].all() or case_type not in ("1", "2"):
             return redirect(url_for("index"))
 
         query_params = {}
@@ -42,83 +89,46 @@ def mostrar_resultado():
             break
 
     case_type = request.args.get("case_type", "1")
+    static_plots = (
+        request.args.get("plots") == "static"
+        or len(raw_ruts) >= STATIC_PLOTS_MIN_DRONES
+    )
 
-    clean_list = [''.join(filter(str.isdigit, r)) for r in raw_ruts]
     if (
-        len(clean_list) < 2
-        or any(len(rc) < 8 for rc in clean_list)
+        len(raw_ruts) < 2
+        or not parse_ruts_bulk(raw_ruts)[1].all()
         or case_type not in ("1", "2")
     ):
         return redirect(url_for("index"))
 
-    n = len(raw_ruts)
-
-    ellipses_orig = []
-    for r in raw_ruts:
-        e = EllipseGenerator(r, case_type=case_type)
-        ellipses_orig.append(e)
-
-    orig_params = []
-    for e in ellipses_orig:
-        digits = e.digits
-        h, k = e.h, e.k
-        a, b = e.a, e.b
-        orientation = e.orientation
-        eq_can = e.canonical_equation()
-        A, B, C, D, F = e.general_equation()
-        eq_gen = f"{A}x^2 + {B}y^2 + {C}x + {D}y + {F}"
-        orig_params.append({
-            "rut": e.rut,
-            "digits": digits,
-            "h": h,
-            "k": k,
-            "a": a,
-            "b": b,
-            "orientation": orientation,
-            "eq_can": eq_can,
-            "eq_gen": eq_gen
-        })
-
-    collisions_orig = []
-    for i in range(n):
-        for j in range(i + 1, n):
-            e1 = ellipses_orig[i]
-            e2 = ellipses_orig[j]
-            col = CollisionDetector.detect_collision(e1, e2)
-            nivel = CollisionDetector.collision_risk_level(e1, e2)
-            collisions_orig.append({
-                "i": i,
-                "j": j,
-                "colision": col,
-                "nivel": round(nivel * 100, 0)
-            })
+    etag = build_etag(raw_ruts, case_type, static_plots, ADJUST_PROBES_PER_PAIR)
+    cached = not_modified(request, etag)
+    # Si se expulsaron sus imágenes, se vuelve a calcular la página para re-encolarlas
+    if cached is not None and (not static_plots or page_images_available(etag)):
+        return cached
+
+    fleet_orig = Fleet.from_ruts(raw_ruts, case_type=case_type)
+    ellipses_orig = fleet_orig.drones()
+    orig_params = fleet_orig.params()
+
+    collisions_orig = collision_table(ellipses_orig)
 
     ellipses_final = [e for e in ellipses_orig]
     ruts_final = [r for r in raw_ruts]
 
-    def existe_colision(lista_ellipses):
-        for x in range(len(lista_ellipses)):
-            for y in range(x + 1, len(lista_ellipses)):
-                if CollisionDetector.detect_collision(lista_ellipses[x], lista_ellipses[y]):
-                    return True
-        return False
-
     max_iter = 50
     iter_count = 0
+    pares_conflicto = [(c["i"], c["j"]) for c in collisions_orig if c["colision"]]
+    # Presupuesto de sondeos (determinista, compatible con el ETag de la respuesta),
+    # proporcional a los pares en conflicto de la flota original
+    budget = SearchBudget(max_probes=ADJUST_PROBES_PER_PAIR * max(1, len(pares_conflicto)))
 
-    while existe_colision(ellipses_final) and iter_count < max_iter:
+    while pares_conflicto and iter_count < max_iter and not budget.exhausted():
         iter_count += 1
 
-        pares_conflicto = []
-        for i in range(n):
-            for j in range(i + 1, n):
-                if CollisionDetector.detect_collision(ellipses_final[i], ellipses_final[j]):
-                    pares_conflicto.append((i, j))
-
-        if not pares_conflicto:
-            break
-
         for (i, j) in pares_conflicto:
+            if budget.exhausted():
+                break
             e1 = ellipses_final[i]
             e2 = ellipses_final[j]
 
@@ -137,7 +147,8 @@ def mostrar_resultado():
                 h1, k1, orientation1,
                 h2, k2, orientation2,
                 case_type,
-                rut1_str, rut2_str
+                rut1_str, rut2_str,
+                budget=budget
             )
 
             ellipses_final[i] = e1_new
@@ -145,63 +156,54 @@ def mostrar_resultado():
             ruts_final[i] = rut1_new
             ruts_final[j] = rut2_new
 
-
-    collisions_final = []
-    for i in range(n):
-        for j in range(i + 1, n):
-            e1f = ellipses_final[i]
-            e2f = ellipses_final[j]
-            col = CollisionDetector.detect_collision(e1f, e2f)
-            nivel = CollisionDetector.collision_risk_level(e1f, e2f)
-            collisions_final.append({
-                "i": i,
-                "j": j,
-                "colision": col,
-                "nivel": round(nivel * 100, 0)
-            })
-
-    final_params = []
-    for idx, e in enumerate(ellipses_final):
-        digits = e.digits
-        h, k = e.h, e.k
-        a, b = e.a, e.b
-        orientation = e.orientation
-        eq_can = e.canonical_equation()
-        A, B, C, D, F = e.general_equation()
-        eq_gen = f"{A}x^2 + {B}y^2 + {C}x + {D}y + {F}"
-        final_params.append({
-            "rut": ruts_final[idx],
-            "digits": digits,
-            "h": h,
-            "k": k,
-            "a": a,
-            "b": b,
-            "orientation": orientation,
-            "eq_can": eq_can,
-            "eq_gen": eq_gen
-        })
-
-    plot2d_orig = build_2d_plot(
-        ellipses_orig,
-        title="Trayectorias 2D (Originales)"
-    )
-    plot3d_orig = build_3d_plot(
-        ellipses_orig,
-        title="Trayectorias 3D (Originales)",
-        height_z=50
-    )
-
-    plot2d_final = build_2d_plot(
-        ellipses_final,
-        title="Trayectorias 2D (Finales – SAFE)"
-    )
-    plot3d_final = build_3d_plot(
-        ellipses_final,
-        title="Trayectorias 3D (Finales – SAFE)",
-        height_z=50
-    )
-
-    return render_template(
+        pares_conflicto = conflict_pairs(ellipses_final, budget=budget)
+
+
+    collisions_final = collision_table(ellipses_final)
+
+    final_params = Fleet.from_ellipses(ellipses_final, ruts=ruts_final).params()
+
+    if static_plots:
+        titles = (
+            "Trayectorias 2D (Originales)", "Trayectorias 3D (Originales)",
+            "Trayectorias 2D (Finales – SAFE)", "Trayectorias 3D (Finales – SAFE)",
+        )
+        files = [
+            build_2d_image(ellipses_orig, titles[0]),
+            build_3d_image(ellipses_orig, titles[1], height_z=50),
+            build_2d_image(ellipses_final, titles[2]),
+            build_3d_image(ellipses_final, titles[3], height_z=50),
+        ]
+        plot2d_orig, plot3d_orig, plot2d_final, plot3d_final = (
+            static_plot_tag(f, t) for f, t in zip(files, titles)
+        )
+        record_page_images(etag, files)
+    else:
+        plot2d_orig = build_2d_plot(
+            ellipses_orig,
+            title="Trayectorias 2D (Originales)",
+            div_id=f"plot-{etag[:16]}-0"
+        )
+        plot3d_orig = build_3d_plot(
+            ellipses_orig,
+            title="Trayectorias 3D (Originales)",
+            height_z=50,
+            div_id=f"plot-{etag[:16]}-1"
+        )
+
+        plot2d_final = build_2d_plot(
+            ellipses_final,
+            title="Trayectorias 2D (Finales – SAFE)",
+            div_id=f"plot-{etag[:16]}-2"
+        )
+        plot3d_final = build_3d_plot(
+            ellipses_final,
+            title="Trayectorias 3D (Finales – SAFE)",
+            height_z=50,
+            div_id=f"plot-{etag[:16]}-3"
+        )
+
+    html = render_template(
         "resultado_multiple.html",
 
         raw_ruts=raw_ruts,
@@ -213,8 +215,22 @@ def mostrar_resultado():
         final_params=final_params,
         collisions_final=collisions_final,
         plot2d_final=plot2d_final,
-        plot3d_final=plot3d_final
+        plot3d_final=plot3d_final,
+        ajuste_truncado=budget.truncated
     )
+    return cached_response(request, etag, html)
+
+
+@app.route("/plots/<filename>")
+def serve_plot(filename):
+    try:
+        path = wait_for_image(filename)
+    except TimeoutError:
+        return "Imagen en preparación", 503, {"Retry-After": str(RENDER_TIMEOUT)}
+    if path is None:
+        abort(404)
+    # Nombre direccionado por contenido: la imagen nunca cambia
+    return send_from_directory(PLOTS_FOLDER, filename, max_age=31536000)
 
 
 if __name__ == "__main__":
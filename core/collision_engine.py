@@ -5,10 +5,15 @@ class CollisionDetector:
     @staticmethod
     def detect_collision(ellipse1, ellipse2):
         x1, y1, _ = ellipse1.generate_points(num_points=200)
-        poly1 = Polygon(np.column_stack((x1, y1)))
-
         x2, y2, _ = ellipse2.generate_points(num_points=200)
-        poly2 = Polygon(np.column_stack((x2, y2)))
+        return CollisionDetector.boundaries_intersect(
+            np.column_stack((x1, y1)), np.column_stack((x2, y2))
+        )
+
+    @staticmethod
+    def boundaries_intersect(points1, points2):
+        poly1 = Polygon(points1)
+        poly2 = Polygon(points2)
 
         boundary1 = poly1.boundary
         boundary2 = poly2.boundary
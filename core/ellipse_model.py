@@ -1,4 +1,5 @@
 import numpy as np
+from core.rut_parser import extract_first8_digits, parse_ruts_bulk
 
 class EllipseGenerator:
     def __init__(self, rut, case_type="1"):
@@ -9,11 +10,23 @@ class EllipseGenerator:
         self.a, self.b = self._calculate_axes()
         self.orientation = self._determine_orientation()
 
+    @classmethod
+    def from_params(cls, rut, case_type, digits, h, k, a, b, orientation):
+        # Mismos atributos que __init__, sin volver a parsear el RUT
+        e = cls.__new__(cls)
+        e.rut = rut
+        e.case_type = case_type
+        e.digits = digits
+        e.h, e.k = h, k
+        e.a, e.b = a, b
+        e.orientation = orientation
+        return e
+
     def _parse_rut(self):
-        clean_rut = ''.join(filter(str.isdigit, self.rut))
-        if len(clean_rut) < 8:
+        digits = extract_first8_digits(self.rut)
+        if len(digits) < 8:
             raise ValueError("El RUT debe contener al menos 8 dígitos numéricos.")
-        return [int(d) for d in clean_rut[:8]]
+        return digits
 
     def _calculate_center(self):
         return self.digits[0], self.digits[1]
@@ -74,3 +87,117 @@ class EllipseGenerator:
             y = self.k + self.a * np.sin(theta)
         z = np.full_like(x, height)
         return x, y, z
+
+
+class Fleet:
+    def __init__(self, digits, h, k, a, b, vertical, case_type="1", ruts=None):
+        self.case_type = case_type
+        self.digits = np.ascontiguousarray(digits, dtype=np.uint8).reshape(-1, 8)
+        self.h = np.ascontiguousarray(h, dtype=np.int64)
+        self.k = np.ascontiguousarray(k, dtype=np.int64)
+        self.a = np.ascontiguousarray(a, dtype=np.int64)
+        self.b = np.ascontiguousarray(b, dtype=np.int64)
+        self.vertical = np.ascontiguousarray(vertical, dtype=bool)
+        self.ruts = list(ruts) if ruts is not None else [""] * len(self.h)
+
+    @classmethod
+    def from_digits(cls, digits, case_type="1", ruts=None):
+        d = np.asarray(digits, dtype=np.int64).reshape(-1, 8)
+        if case_type == "1":
+            a = d[:, 2] + d[:, 3]
+            b = d[:, 4] + d[:, 5]
+            vertical = d[:, 7] % 2 != 0
+        else:
+            a = d[:, 5] + d[:, 6]
+            b = d[:, 7] + d[:, 2]
+            vertical = d[:, 3] % 2 != 0
+        return cls(d, d[:, 0], d[:, 1], a, b, vertical, case_type=case_type, ruts=ruts)
+
+    @classmethod
+    def from_ruts(cls, ruts, case_type="1"):
+        digits, valid, _ = parse_ruts_bulk(ruts)
+        if not valid.all():
+            raise ValueError("El RUT debe contener al menos 8 dígitos numéricos.")
+        return cls.from_digits(digits, case_type=case_type, ruts=ruts)
+
+    @classmethod
+    def from_ellipses(cls, ellipses, ruts=None):
+        # Las elipses ajustadas pueden tener a, b y orientación distintos a sus dígitos
+        return cls(
+            [e.digits for e in ellipses],
+            [e.h for e in ellipses],
+            [e.k for e in ellipses],
+            [e.a for e in ellipses],
+            [e.b for e in ellipses],
+            [e.orientation == "vertical" for e in ellipses],
+            case_type=ellipses[0].case_type if ellipses else "1",
+            ruts=ruts if ruts is not None else [e.rut for e in ellipses],
+        )
+
+    def __len__(self):
+        return len(self.h)
+
+    @property
+    def orientation(self):
+        return np.where(self.vertical, "vertical", "horizontal")
+
+    def general_coefficients(self):
+        # Columnas A, B, C, D, F de Ax^2 + By^2 + Cx + Dy + F = 0
+        a2, b2 = self.a ** 2, self.b ** 2
+        A = np.where(self.vertical, a2, b2)
+        B = np.where(self.vertical, b2, a2)
+        C = -2 * A * self.h
+        D = -2 * B * self.k
+        F = A * self.h ** 2 + B * self.k ** 2 - a2 * b2
+        return np.column_stack((A, B, C, D, F))
+
+    def canonical_equations(self):
+        den_x = np.where(self.vertical, self.b, self.a) ** 2
+        den_y = np.where(self.vertical, self.a, self.b) ** 2
+        return [
+            f"\\frac{{(x - {h})^2}}{{{dx}}} + "
+            f"\\frac{{(y - {k})^2}}{{{dy}}} = 1"
+            for h, k, dx, dy in zip(self.h.tolist(), self.k.tolist(), den_x.tolist(), den_y.tolist())
+        ]
+
+    def boundary_points(self, num_points=100):
+        # Mismos puntos que EllipseGenerator.generate_points, para toda la flota: (N, num_points, 2)
+        theta = np.linspace(0, 2 * np.pi, num_points)
+        rx = np.where(self.vertical, self.b, self.a)[:, None]
+        ry = np.where(self.vertical, self.a, self.b)[:, None]
+        points = np.empty((len(self), num_points, 2), dtype=np.float64)
+        points[:, :, 0] = self.h[:, None] + rx * np.cos(theta)
+        points[:, :, 1] = self.k[:, None] + ry * np.sin(theta)
+        return points
+
+    def drone(self, i):
+        return EllipseGenerator.from_params(
+            self.ruts[i], self.case_type, self.digits[i].tolist(),
+            int(self.h[i]), int(self.k[i]), int(self.a[i]), int(self.b[i]),
+            "vertical" if self.vertical[i] else "horizontal",
+        )
+
+    def drones(self):
+        return [self.drone(i) for i in range(len(self))]
+
+    def params(self):
+        coefs = self.general_coefficients().tolist()
+        orientation = self.orientation.tolist()
+        return [
+            {
+                "rut": rut,
+                "digits": digits,
+                "h": h,
+                "k": k,
+                "a": a,
+                "b": b,
+                "orientation": orient,
+                "eq_can": eq_can,
+                "eq_gen": f"{A}x^2 + {B}y^2 + {C}x + {D}y + {F}",
+            }
+            for rut, digits, h, k, a, b, orient, eq_can, (A, B, C, D, F) in zip(
+                self.ruts, self.digits.tolist(), self.h.tolist(), self.k.tolist(),
+                self.a.tolist(), self.b.tolist(), orientation,
+                self.canonical_equations(), coefs,
+            )
+        ]
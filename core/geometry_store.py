@@ -0,0 +1,133 @@
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+import shapely
+from shapely.geometry import Polygon
+
+from core.ellipse_model import Fleet
+
+
+def _layout(n, num_points):
+    # Un segmento contiguo por campo (estructura de arrays, igual que Fleet)
+    fields = (
+        ("digits", np.uint8, (n, 8)),
+        ("h", np.int64, (n,)),
+        ("k", np.int64, (n,)),
+        ("a", np.int64, (n,)),
+        ("b", np.int64, (n,)),
+        ("vertical", np.bool_, (n,)),
+        ("points", np.float64, (n, num_points, 2)),
+    )
+    layout, offset = [], 0
+    for name, dtype, shape in fields:
+        offset = -(-offset // 8) * 8
+        layout.append((name, dtype, shape, offset))
+        offset += int(np.prod(shape)) * np.dtype(dtype).itemsize
+    return layout, max(offset, 1)
+
+
+class GeometryStore:
+    def __init__(self, shm, n, num_points, case_type, owner):
+        self.shm = shm
+        self.n = n
+        self.num_points = num_points
+        self.case_type = case_type
+        self.owner = owner
+        self._boundaries = {}  # Geometrías Shapely de este proceso, una por elipse
+
+        layout, _ = _layout(n, num_points)
+        for name, dtype, shape, offset in layout:
+            setattr(self, name, np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset))
+
+    @classmethod
+    def create(cls, ellipses, num_points=200):
+        fleet = ellipses if isinstance(ellipses, Fleet) else Fleet.from_ellipses(ellipses)
+        n = len(fleet)
+        _, size = _layout(n, num_points)
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        store = cls(shm, n, num_points, fleet.case_type, owner=True)
+        store.digits[:] = fleet.digits
+        store.h[:], store.k[:] = fleet.h, fleet.k
+        store.a[:], store.b[:] = fleet.a, fleet.b
+        store.vertical[:] = fleet.vertical
+        store.points[:] = fleet.boundary_points(num_points)
+        return store
+
+    @classmethod
+    def attach(cls, handle):
+        name, n, num_points, case_type = handle
+        shm = shared_memory.SharedMemory(name=name)
+        return cls(shm, n, num_points, case_type, owner=False)
+
+    @property
+    def handle(self):
+        # Tupla liviana para enviar a otros procesos en lugar de las elipses
+        return (self.shm.name, self.n, self.num_points, self.case_type)
+
+    def fleet(self):
+        # Vistas sobre la memoria compartida, sin copiar
+        return Fleet(self.digits, self.h, self.k, self.a, self.b, self.vertical,
+                     case_type=self.case_type)
+
+    def boundary(self, i):
+        geom = self._boundaries.get(i)
+        if geom is None:
+            geom = Polygon(self.points[i]).boundary
+            shapely.prepare(geom)
+            self._boundaries[i] = geom
+        return geom
+
+    def collides(self, i, j):
+        return self.boundary(i).intersects(self.boundary(j))
+
+    def close(self):
+        self._boundaries.clear()
+        for name, _, _, _ in _layout(0, 0)[0]:
+            delattr(self, name)
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_pool = None
+_worker_stores = {}
+
+
+def _attached(handle):
+    # Cada worker conserva solo el almacén más reciente y sus geometrías
+    store = _worker_stores.get(handle[0])
+    if store is None:
+        for old in _worker_stores.values():
+            old.close()
+        _worker_stores.clear()
+        store = _worker_stores[handle[0]] = GeometryStore.attach(handle)
+    return store
+
+
+def _worker_collides(task):
+    handle, pairs = task
+    store = _attached(handle)
+    return [store.collides(i, j) for i, j in pairs]
+
+
+def get_pool(processes=None):
+    global _pool
+    if _pool is None:
+        # forkserver: el pool se crea desde un hilo de Flask y fork con hilos puede bloquearse
+        _pool = multiprocessing.get_context("forkserver").Pool(processes)
+    return _pool
+
+
+def pairwise_collisions(store, pairs=None, chunk_size=64):
+    if pairs is None:
+        pairs = [(i, j) for i in range(store.n) for j in range(i + 1, store.n)]
+    # Solo viajan el handle y los índices; la geometría se lee de la memoria compartida
+    tasks = [(store.handle, pairs[s:s + chunk_size]) for s in range(0, len(pairs), chunk_size)]
+    return [col for chunk in get_pool().map(_worker_collides, tasks) for col in chunk]
@@ -0,0 +1,82 @@
+import re
+
+import numpy as np
+
+
+# Única definición de dígito para ambas rutas: solo ASCII '0'-'9'
+_NON_DIGIT = re.compile(r"[^0-9]")
+_CHECK_WEIGHTS = np.array([3, 2, 7, 6, 5, 4, 3, 2], dtype=np.int32)  # Módulo 11: 2..7 de derecha a izquierda
+
+
+def _stream(ruts) -> tuple[np.ndarray, np.ndarray, int]:
+    # Todos los caracteres en un vector plano más el índice de RUT de cada uno
+    if isinstance(ruts, np.ndarray) and ruts.dtype.kind in "SU":
+        n = len(ruts)
+        if n == 0:
+            return np.zeros(0, dtype=np.uint8), np.zeros(0, dtype=np.int32), 0
+        itemsize = 1 if ruts.dtype.kind == "S" else 4
+        width = ruts.dtype.itemsize // itemsize
+        data = ruts.view(np.uint8 if itemsize == 1 else np.uint32).ravel()
+        return data, np.repeat(np.arange(n, dtype=np.int32), width), n
+
+    if not isinstance(ruts, (bytes, bytearray, memoryview)):
+        # Unir y codificar es mucho más rápido que np.asarray sobre millones de str
+        ruts = [str(r) for r in ruts]
+        ruts = ("\n".join(ruts) + "\n").encode("utf-8") if ruts else b""
+    data = np.frombuffer(ruts, dtype=np.uint8)
+    newline = data == ord("\n")
+    line = np.cumsum(newline, dtype=np.int32) - newline
+    n = int(line[-1]) + 1 if data.size else 0
+    return data, line, n
+
+
+def _parse_stream(data: np.ndarray, line: np.ndarray, n: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    is_digit = (data - ord("0")) < 10  # sin signo: lo menor que '0' da la vuelta
+    digit_pos = np.flatnonzero(is_digit)
+    flat = (data[digit_pos] - ord("0")).astype(np.uint8)
+    counts = np.bincount(line[digit_pos], minlength=n)
+    offsets = np.cumsum(counts) - counts
+
+    first8 = np.arange(8)
+    padded = np.concatenate((flat, np.zeros(8, dtype=np.uint8)))
+    digits = padded[offsets[:, None] + first8] * (first8 < counts[:, None])
+
+    # Verificador: último alfanumérico si es 'K', si hay guion o si sobran dígitos
+    is_k = (data | 32) == ord("k")
+    alnum_pos = np.flatnonzero(is_digit | is_k)
+    alnum_line = line[alnum_pos]
+    is_last = np.append(alnum_line[1:] != alnum_line[:-1], True)[:alnum_pos.size]
+    last_is_k = np.zeros(n, dtype=bool)
+    last_is_k[alnum_line[is_last]] = is_k[alnum_pos[is_last]]
+    has_alnum = np.zeros(n, dtype=bool)
+    has_alnum[alnum_line[is_last]] = True
+    has_hyphen = np.zeros(n, dtype=bool)
+    has_hyphen[line[data == ord("-")]] = True
+    has_verifier = has_alnum & (last_is_k | has_hyphen | (counts >= 9))
+
+    # Cuerpo: los 7 u 8 dígitos anteriores al verificador, alineados a la derecha
+    digit_verifier = has_verifier & ~last_is_k
+    body_len = counts - digit_verifier
+    padded = np.concatenate((np.zeros(8, dtype=np.uint8), flat))
+    body = padded[(offsets + body_len)[:, None] + first8] * (first8 >= 8 - body_len[:, None])
+    total = body.astype(np.int32) @ _CHECK_WEIGHTS
+
+    remainder = 11 - total % 11
+    expected = np.where(remainder == 11, 0, remainder)  # 10 representa 'K'
+    given = np.where(digit_verifier, padded[offsets + counts + 7], 10)
+    check_ok = has_verifier & (body_len >= 1) & (body_len <= 8) & (given == expected)
+    return digits.astype(np.uint8), counts, check_ok
+
+
+def parse_ruts_bulk(ruts) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    digits, counts, check_ok = _parse_stream(*_stream(ruts))
+    return digits, counts >= 8, check_ok
+
+
+def clean_rut(rut: str) -> str:
+    return _NON_DIGIT.sub("", rut)
+
+
+def extract_first8_digits(rut: str) -> list[int]:
+    # Ruta escalar: para un solo RUT es más barata que parse_ruts_bulk
+    return [int(d) for d in clean_rut(rut)[:8]]
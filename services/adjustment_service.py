@@ -1,9 +1,29 @@
+import time
 import numpy as np
 from core.ellipse_model import EllipseGenerator
 from core.collision_engine import CollisionDetector
 from services.rut_helper import format_rut_from_digits
 
 
+class SearchBudget:
+    def __init__(self, seconds: float | None = None, max_probes: int | None = None):
+        self.deadline = time.monotonic() + seconds if seconds is not None else None
+        self.max_probes = max_probes
+        self.probes = 0
+        self.truncated = False
+
+    def exhausted(self) -> bool:
+        if (
+            (self.max_probes is not None and self.probes >= self.max_probes)
+            or (self.deadline is not None and time.monotonic() >= self.deadline)
+        ):
+            self.truncated = True
+        return self.truncated
+
+    def spend(self, count: int = 1) -> None:
+        self.probes += count
+
+
 def adjust_ellipses(
     e1, e2,
     digits1: list[int], digits2: list[int],
@@ -11,7 +31,8 @@ def adjust_ellipses(
     h2: float, k2: float, orientation2: str,
     case_type: str,
     rut1_str: str,
-    rut2_str: str
+    rut2_str: str,
+    budget: SearchBudget | None = None
 ) -> tuple[
     EllipseGenerator, EllipseGenerator,
     str, str,  
@@ -30,6 +51,11 @@ def adjust_ellipses(
     rut2_adjusted = rut2_str
 
     def collision_with_candidate_e2(candidate_digits2: list[int]) -> bool:
+        # Sin presupuesto, el candidato se descarta y se pasa al fallback
+        if budget is not None:
+            if budget.exhausted():
+                return True
+            budget.spend()
         tmp = EllipseGenerator(format_rut_from_digits(candidate_digits2, ""), case_type=case_type)
         tmp.h, tmp.k = h2, k2
         tmp.orientation = orientation2
@@ -44,6 +70,11 @@ def adjust_ellipses(
         return CollisionDetector.detect_collision(e1, tmp)
 
     def collision_with_candidate_e1(candidate_digits1: list[int]) -> bool:
+        # Sin presupuesto, el candidato se descarta y se pasa al fallback
+        if budget is not None:
+            if budget.exhausted():
+                return True
+            budget.spend()
         tmp = EllipseGenerator(format_rut_from_digits(candidate_digits1, ""), case_type=case_type)
         tmp.h, tmp.k = h1, k1
         tmp.orientation = orientation1
@@ -63,6 +94,8 @@ def adjust_ellipses(
     if case_type == "1":
         d3_o, d4_o, d5_o, d6_o = digits2[2], digits2[3], digits2[4], digits2[5]
         for reduccion in range(1, orig_a2 + orig_b2 + 1):
+            if budget is not None and budget.exhausted():
+                break
             for new_a2 in range(orig_a2 - 1, 0, -1):
                 redA = orig_a2 - new_a2
                 redB = reduccion - redA
@@ -115,6 +148,8 @@ def adjust_ellipses(
     else: 
         d6_o, d7_o, d8_o, d3_o = digits2[5], digits2[6], digits2[7], digits2[2]
         for reduccion in range(1, orig_a2 + orig_b2 + 1):
+            if budget is not None and budget.exhausted():
+                break
             for new_a2 in range(orig_a2 - 1, 0, -1):
                 redA = orig_a2 - new_a2
                 redB = reduccion - redA
@@ -177,6 +212,8 @@ def adjust_ellipses(
         if case_type == "1":
             d3o1, d4o1, d5o1, d6o1 = digits1[2], digits1[3], digits1[4], digits1[5]
             for reduccion in range(1, orig_a1 + orig_b1 + 1):
+                if budget is not None and budget.exhausted():
+                    break
                 for new_a1 in range(orig_a1 - 1, 0, -1):
                     redA = orig_a1 - new_a1
                     redB = reduccion - redA
@@ -229,6 +266,8 @@ def adjust_ellipses(
         else:  
             d6o1, d7o1, d8o1, d3o1 = digits1[5], digits1[6], digits1[7], digits1[2]
             for reduccion in range(1, orig_a1 + orig_b1 + 1):
+                if budget is not None and budget.exhausted():
+                    break
                 for new_a1 in range(orig_a1 - 1, 0, -1):
                     redA = orig_a1 - new_a1
                     redB = reduccion - redA
@@ -0,0 +1,13 @@
+import os
+from functools import lru_cache
+
+import yaml
+
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@lru_cache(maxsize=None)
+def load_config() -> dict:
+    with open(os.path.join(BASE_DIR, "config.yaml"), encoding="utf-8") as fh:
+        return yaml.safe_load(fh) or {}
@@ -0,0 +1,67 @@
+import gzip
+import hashlib
+import json
+
+from flask import Response
+
+try:
+    import brotli
+except ImportError:  # Incluido en requirements.txt; si falta, solo se ofrece gzip
+    brotli = None
+
+
+RENDER_VERSION = "4"  # Incrementar al cambiar plantillas o la lógica de ajuste
+CACHE_MAX_AGE = 3600
+
+
+def build_etag(raw_ruts: list[str], case_type: str, static_plots: bool = False,
+               probes_per_pair: int | None = None) -> str:
+    # Incluir toda configuración que cambie el resultado de la página
+    payload = json.dumps(
+        {"v": RENDER_VERSION, "ruts": list(raw_ruts), "case_type": case_type,
+         "static_plots": static_plots, "probes_per_pair": probes_per_pair},
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def choose_encoding(req) -> str | None:
+    offers = ["br", "gzip"] if brotli is not None else ["gzip"]
+    return req.accept_encodings.best_match(offers, default=None)
+
+
+def variant_etag(base_etag: str, encoding: str | None) -> str:
+    # ETag fuerte: cada codificación es una representación distinta
+    return f"{base_etag}-{encoding}" if encoding else base_etag
+
+
+def _set_cache_headers(resp: Response, etag: str) -> Response:
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = f"public, max-age={CACHE_MAX_AGE}"
+    resp.vary.add("Accept-Encoding")
+    return resp
+
+
+def not_modified(req, base_etag: str) -> Response | None:
+    etag = variant_etag(base_etag, choose_encoding(req))
+    if not req.if_none_match.contains_weak(etag):
+        return None
+    return _set_cache_headers(Response(status=304), etag)
+
+
+def compress_body(body: bytes, encoding: str | None) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=6, mtime=0)  # Bytes idénticos para el mismo ETag
+    return body
+
+
+def cached_response(req, base_etag: str, html: str) -> Response:
+    body = html.encode("utf-8")
+    encoding = choose_encoding(req)
+    resp = Response(compress_body(body, encoding), mimetype="text/html")
+    if encoding:
+        resp.headers["Content-Encoding"] = encoding
+    return _set_cache_headers(resp, variant_etag(base_etag, encoding))
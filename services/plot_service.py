@@ -3,7 +3,7 @@ import plotly.express as px
 import plotly.io as pio
 
 
-def build_2d_plot(drones: list, title: str) -> str:
+def build_2d_plot(drones: list, title: str, div_id: str | None = None) -> str:
     palette = px.colors.qualitative.Plotly  # Paleta cíclica
     fig = go.Figure()
 
@@ -46,10 +46,11 @@ def build_2d_plot(drones: list, title: str) -> str:
         margin=dict(l=40, r=40, t=40, b=40),
     )
 
-    return pio.to_html(fig, full_html=False, include_plotlyjs=False)
+    # div_id fijo: sin él Plotly genera un UUID y el HTML cambia en cada render
+    return pio.to_html(fig, full_html=False, include_plotlyjs=False, div_id=div_id)
 
 
-def build_3d_plot(drones: list, title: str, height_z: float = 50) -> str:
+def build_3d_plot(drones: list, title: str, height_z: float = 50, div_id: str | None = None) -> str:
     palette = px.colors.qualitative.Plotly
     fig = go.Figure()
 
@@ -97,4 +98,5 @@ def build_3d_plot(drones: list, title: str, height_z: float = 50) -> str:
         margin=dict(l=40, r=40, t=40, b=40),
     )
 
-    return pio.to_html(fig, full_html=False, include_plotlyjs=False)
+    # div_id fijo: sin él Plotly genera un UUID y el HTML cambia en cada render
+    return pio.to_html(fig, full_html=False, include_plotlyjs=False, div_id=div_id)
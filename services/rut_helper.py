@@ -1,5 +1,4 @@
-def clean_rut(rut: str) -> str:
-    return ''.join(filter(str.isdigit, rut))
+from core.rut_parser import clean_rut, extract_first8_digits, parse_ruts_bulk
 
 
 def format_rut_from_digits(digs8: list[int], check: str) -> str:
@@ -12,11 +11,6 @@ def format_rut_from_digits(digs8: list[int], check: str) -> str:
         return f"{s8[0:2]}.{s8[2:5]}.{s8[5:8]}"
 
 
-def extract_first8_digits(rut: str) -> list[int]:
-    clean = clean_rut(rut)
-    return [int(d) for d in clean[:8]]
-
-
 def extract_check_digit(rut: str) -> str:
     clean = clean_rut(rut)
     return clean[8:] if len(clean) > 8 else ""
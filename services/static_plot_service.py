@@ -0,0 +1,265 @@
+import contextlib
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from core.ellipse_model import Fleet
+from services.config import BASE_DIR, load_config
+from services.http_cache import CACHE_MAX_AGE
+
+
+_config = load_config().get("graphics", {})
+PLOTS_FOLDER = os.path.join(BASE_DIR, _config.get("plots_folder", "static/plots"))
+PLOTS_FORMAT = _config.get("plots_format", "png")
+PLOTS_MAX_BYTES = _config.get("plots_max_bytes", 200 * 1024 * 1024)
+PLOTS_MAX_AGE = _config.get("plots_max_age", 7 * 24 * 3600)
+RESOLUTION = _config.get("resolution", 100)
+PAGES_FOLDER = os.path.join(PLOTS_FOLDER, "pages")
+RENDER_TIMEOUT = 30
+STALE_MARKER_AGE = 600  # Una marca más antigua corresponde a un render interrumpido
+
+logger = logging.getLogger(__name__)
+
+_IMAGE_NAME = re.compile(r"[0-9a-f]{64}\.(png|svg)")
+
+_executor = None
+_pending = {}
+_lock = threading.Lock()
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # forkserver: el pool se crea desde un hilo de Flask y fork con hilos puede bloquearse
+        _executor = ProcessPoolExecutor(
+            max_workers=_config.get("render_workers", 2),
+            mp_context=multiprocessing.get_context("forkserver"),
+        )
+    return _executor
+
+
+def _reset_executor(broken: ProcessPoolExecutor) -> None:
+    # Un worker murió (p. ej. OOM): el pool queda inservible y se crea otro en el próximo envío
+    global _executor
+    if _executor is broken:
+        _executor = None
+        broken.shutdown(wait=False)
+
+
+def _geometry(drones: list) -> list[tuple]:
+    return [(d.h, d.k, d.a, d.b, d.orientation == "vertical") for d in drones]
+
+
+def geometry_hash(kind: str, geometry: list[tuple], title: str, height_z: float, fmt: str) -> str:
+    payload = json.dumps(
+        {"kind": kind, "geometry": geometry, "title": title, "z": height_z,
+         "fmt": fmt, "points": RESOLUTION},
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _render(kind: str, geometry: list[tuple], title: str, height_z: float, fmt: str, path: str) -> str:
+    # Se ejecuta en un proceso del pool: solo recibe tuplas, nunca objetos de elipse
+    from matplotlib.figure import Figure
+
+    h, k, a, b, vertical = (np.array(col) for col in zip(*geometry))
+    fleet = Fleet(np.zeros((len(h), 8)), h, k, a, b, vertical)
+    points = fleet.boundary_points(RESOLUTION)
+
+    fig = Figure(figsize=(6, 6))
+    if kind == "3d":
+        ax = fig.add_subplot(projection="3d")
+        for i in range(len(fleet)):
+            color = f"C{i % 10}"
+            ax.plot(points[i, :, 0], points[i, :, 1], np.full(RESOLUTION, height_z),
+                    color=color, label=f"Dron {i+1}")
+            ax.scatter([h[i]], [k[i]], [height_z], color=color, s=12)
+            ax.text(h[i], k[i], height_z, f"({h[i]},{k[i]},{height_z})")
+        ax.set_zlabel("Z")
+    else:
+        ax = fig.add_subplot()
+        for i in range(len(fleet)):
+            color = f"C{i % 10}"
+            ax.plot(points[i, :, 0], points[i, :, 1], color=color, label=f"Dron {i+1}")
+            ax.scatter([h[i]], [k[i]], color=color, s=12)
+            ax.annotate(f"({h[i]},{k[i]})", (h[i], k[i]), ha="center", va="bottom")
+    ax.set_title(title)
+    ax.set_xlabel("X")
+    ax.set_ylabel("Y")
+    ax.legend(loc="upper right")
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    fig.savefig(tmp_path, format=fmt)
+    os.replace(tmp_path, path)
+    return path
+
+
+def _remove(path: str) -> None:
+    # Otro proceso o callback de expulsión pudo haberlo borrado antes
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(path)
+
+
+def _marker(path: str) -> str:
+    # Marca compartida entre procesos: la imagen está en cola o renderizándose
+    return f"{path}.pending"
+
+
+def _age(path: str) -> float | None:
+    try:
+        return time.time() - os.stat(path).st_mtime
+    except FileNotFoundError:
+        return None
+
+
+def _is_pending(path: str) -> bool:
+    age = _age(_marker(path))
+    return age is not None and age < STALE_MARKER_AGE
+
+
+def evict_plots(max_bytes: int = PLOTS_MAX_BYTES, max_age: float = PLOTS_MAX_AGE) -> None:
+    if not os.path.isdir(PLOTS_FOLDER):
+        return
+    # Una página cacheada puede pedir sus imágenes hasta CACHE_MAX_AGE después
+    max_age = max(max_age, CACHE_MAX_AGE)
+    now = time.time()
+    files = []
+    for entry in os.scandir(PLOTS_FOLDER):
+        if not entry.is_file() or entry.name.endswith(".tmp"):
+            continue
+        try:
+            st = entry.stat()
+        except FileNotFoundError:
+            continue
+        if entry.name.endswith(".pending"):
+            if now - st.st_mtime > STALE_MARKER_AGE:
+                _remove(entry.path)
+        elif now - st.st_mtime > max_age:
+            _remove(entry.path)
+        else:
+            files.append((st.st_mtime, st.st_size, entry.path))
+
+    if os.path.isdir(PAGES_FOLDER):
+        for entry in os.scandir(PAGES_FOLDER):
+            age = _age(entry.path)
+            if age is not None and age > max_age:
+                _remove(entry.path)
+
+    total = sum(size for _, size, _ in files)
+    for mtime, size, path in sorted(files):
+        if total <= max_bytes or now - mtime < CACHE_MAX_AGE:
+            break
+        _remove(path)
+        total -= size
+
+
+def _on_done(filename: str, path: str, executor: ProcessPoolExecutor):
+    def callback(future):
+        with _lock:
+            _pending.pop(filename, None)
+            exc = None if future.cancelled() else future.exception()
+            if isinstance(exc, BrokenProcessPool):
+                _reset_executor(executor)
+        if exc is not None:
+            logger.error("Falló el render de %s", filename, exc_info=exc)
+        _remove(_marker(path))
+        evict_plots()
+    return callback
+
+
+def _submit(*args):
+    # Reintenta una vez si el pool se rompió desde el último envío
+    for attempt in range(2):
+        executor = _get_executor()
+        try:
+            return executor, executor.submit(_render, *args)
+        except BrokenProcessPool:
+            _reset_executor(executor)
+            if attempt:
+                raise
+
+
+def _request_image(kind: str, drones: list, title: str, height_z: float = 0, fmt: str = PLOTS_FORMAT) -> str:
+    geometry = _geometry(drones)
+    filename = f"{geometry_hash(kind, geometry, title, height_z, fmt)}.{fmt}"
+    path = os.path.join(PLOTS_FOLDER, filename)
+
+    with _lock:
+        if filename in _pending or _is_pending(path):
+            return filename
+        if os.path.exists(path):
+            with contextlib.suppress(FileNotFoundError):
+                os.utime(path)  # Renovar antigüedad para la política de expulsión
+            return filename
+        os.makedirs(PLOTS_FOLDER, exist_ok=True)
+        # La marca va antes del envío para que el callback nunca la encuentre ausente
+        open(_marker(path), "w").close()
+        try:
+            executor, future = _submit(kind, geometry, title, height_z, fmt, path)
+        except BaseException:
+            _remove(_marker(path))
+            raise
+        _pending[filename] = future
+    future.add_done_callback(_on_done(filename, path, executor))
+    return filename
+
+
+def build_2d_image(drones: list, title: str, fmt: str = PLOTS_FORMAT) -> str:
+    return _request_image("2d", drones, title, fmt=fmt)
+
+
+def build_3d_image(drones: list, title: str, height_z: float = 50, fmt: str = PLOTS_FORMAT) -> str:
+    return _request_image("3d", drones, title, height_z=height_z, fmt=fmt)
+
+
+def record_page_images(page_key: str, filenames: list[str]) -> None:
+    os.makedirs(PAGES_FOLDER, exist_ok=True)
+    path = os.path.join(PAGES_FOLDER, f"{page_key}.json")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        json.dump(filenames, fh)
+    os.replace(tmp_path, path)
+
+
+def page_images_available(page_key: str) -> bool:
+    # Para responder 304: la página cacheada solo sirve si sus imágenes siguen en disco
+    try:
+        with open(os.path.join(PAGES_FOLDER, f"{page_key}.json"), encoding="utf-8") as fh:
+            filenames = json.load(fh)
+    except (FileNotFoundError, ValueError):
+        return False
+    for filename in filenames:
+        path = os.path.join(PLOTS_FOLDER, filename)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            if not _is_pending(path):
+                return False
+    return True
+
+
+def wait_for_image(filename: str, timeout: float = RENDER_TIMEOUT) -> str | None:
+    # Sondea el disco: el render puede estar en otro proceso web; os.replace lo publica atómicamente
+    if not _IMAGE_NAME.fullmatch(filename):
+        return None
+    path = os.path.join(PLOTS_FOLDER, filename)
+    deadline = time.monotonic() + timeout
+    while True:
+        if os.path.isfile(path):
+            return path
+        if not _is_pending(path):
+            return None  # Desconocida, expulsada o el render falló
+        if time.monotonic() >= deadline:
+            raise TimeoutError(filename)
+        time.sleep(0.05)
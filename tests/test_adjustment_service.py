@@ -0,0 +1,68 @@
+import pytest
+
+from core.collision_engine import CollisionDetector
+from core.ellipse_model import EllipseGenerator
+from services.adjustment_service import SearchBudget, adjust_ellipses
+from services.rut_helper import extract_first8_digits
+
+
+# Resultados de adjust_ellipses antes de introducir SearchBudget
+BASELINE = [
+    ("11.999.999-1", "12.999.999-2", "1", ("11.999.999-1", "12.979.899-2", 18, 18, 16, 17)),
+    ("11.999.999-1", "12.999.999-2", "2", ("11.999.999-1", "12.899.979-2", 18, 18, 16, 17)),
+    ("12.345.678-5", "13.456.789-K", "1", ("12.345.678-5", "13.446.089-K", 7, 11, 8, 6)),
+    ("55.555.555-5", "56.555.555-1", "2", ("55.555.555-5", "56.455.535-1", 10, 10, 8, 9)),
+]
+
+
+def _adjust(rut1, rut2, case_type, budget=None):
+    e1 = EllipseGenerator(rut1, case_type=case_type)
+    e2 = EllipseGenerator(rut2, case_type=case_type)
+    return adjust_ellipses(
+        e1, e2,
+        extract_first8_digits(rut1), extract_first8_digits(rut2),
+        e1.h, e1.k, e1.orientation,
+        e2.h, e2.k, e2.orientation,
+        case_type,
+        rut1, rut2,
+        budget=budget
+    )
+
+
+@pytest.mark.parametrize("rut1, rut2, case_type, expected", BASELINE)
+def test_without_budget_matches_baseline(rut1, rut2, case_type, expected):
+    result = _adjust(rut1, rut2, case_type)
+    assert result[2:] == expected
+    assert not CollisionDetector.detect_collision(result[0], result[1])
+
+
+@pytest.mark.parametrize("rut1, rut2, case_type, expected", BASELINE)
+def test_large_budget_is_not_truncated(rut1, rut2, case_type, expected):
+    budget = SearchBudget(max_probes=100000)
+    result = _adjust(rut1, rut2, case_type, budget=budget)
+    assert result[2:] == expected
+    assert budget.probes > 0
+    assert not budget.truncated
+
+
+def test_exhausted_budget_is_truncated():
+    budget = SearchBudget(max_probes=10)
+    result = _adjust("11.999.999-1", "12.999.999-2", "1", budget=budget)
+    assert budget.truncated
+    assert budget.probes == 10
+    assert result[2:] != BASELINE[0][3]
+
+
+def test_expired_deadline_is_truncated():
+    budget = SearchBudget(seconds=0)
+    _adjust("11.999.999-1", "12.999.999-2", "1", budget=budget)
+    assert budget.truncated
+    assert budget.probes == 0
+
+
+def test_spend_counts_scans():
+    budget = SearchBudget(max_probes=10)
+    budget.spend(10)
+    assert budget.probes == 10
+    assert budget.exhausted()
+    assert budget.truncated
@@ -0,0 +1,65 @@
+import random
+
+import numpy as np
+import pytest
+
+from core.ellipse_model import EllipseGenerator, Fleet
+
+
+def _random_ruts(n, seed):
+    rng = random.Random(seed)
+    return [
+        f"{rng.randint(10, 99)}.{rng.randint(0, 999):03d}.{rng.randint(0, 999):03d}-{rng.randint(0, 9)}"
+        for _ in range(n)
+    ]
+
+
+def _params(e):
+    A, B, C, D, F = e.general_equation()
+    return {
+        "rut": e.rut,
+        "digits": e.digits,
+        "h": e.h,
+        "k": e.k,
+        "a": e.a,
+        "b": e.b,
+        "orientation": e.orientation,
+        "eq_can": e.canonical_equation(),
+        "eq_gen": f"{A}x^2 + {B}y^2 + {C}x + {D}y + {F}",
+    }
+
+
+@pytest.mark.parametrize("case_type", ["1", "2"])
+def test_fleet_matches_ellipse_generator(case_type):
+    ruts = _random_ruts(300, seed=int(case_type))
+    ellipses = [EllipseGenerator(r, case_type=case_type) for r in ruts]
+    fleet = Fleet.from_ruts(ruts, case_type=case_type)
+
+    assert fleet.params() == [_params(e) for e in ellipses]
+
+    points = fleet.boundary_points(200)
+    for i, e in enumerate(ellipses):
+        x, y, _ = e.generate_points(num_points=200)
+        assert np.array_equal(points[i], np.column_stack((x, y)))
+        assert vars(fleet.drone(i)) == vars(e)
+
+
+def test_fleet_from_adjusted_ellipses():
+    e = EllipseGenerator("12.345.678-5")
+    e.a, e.b, e.orientation = 3, 2, "vertical"
+    fleet = Fleet.from_ellipses([e, EllipseGenerator("11.111.111-1")])
+    assert fleet.params()[0] == _params(e)
+    assert vars(fleet.drone(0)) == vars(e)
+
+
+def test_from_params_sets_the_same_attributes_as_init():
+    e = EllipseGenerator("12.345.678-5", case_type="2")
+    copy = EllipseGenerator.from_params(
+        e.rut, e.case_type, e.digits, e.h, e.k, e.a, e.b, e.orientation
+    )
+    assert vars(copy) == vars(e)
+
+
+def test_from_ruts_rejects_short_rut():
+    with pytest.raises(ValueError):
+        Fleet.from_ruts(["12.345.678-5", "1234"])
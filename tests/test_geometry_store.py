@@ -0,0 +1,52 @@
+import random
+
+import numpy as np
+import pytest
+
+from core.collision_engine import CollisionDetector
+from core.ellipse_model import EllipseGenerator
+from core.geometry_store import GeometryStore, pairwise_collisions
+
+
+def _ellipses(n, case_type, seed):
+    rng = random.Random(seed)
+    return [
+        EllipseGenerator("".join(rng.choice("0123456789") for _ in range(8)), case_type=case_type)
+        for _ in range(n)
+    ]
+
+
+@pytest.mark.parametrize("case_type", ["1", "2"])
+def test_pool_matches_detect_collision(case_type):
+    ellipses = _ellipses(40, case_type, seed=7)
+    expected = [
+        CollisionDetector.detect_collision(ellipses[i], ellipses[j])
+        for i in range(40) for j in range(i + 1, 40)
+    ]
+    with GeometryStore.create(ellipses) as store:
+        assert pairwise_collisions(store) == expected
+        # Segunda llamada: los workers reutilizan el almacén ya adjunto
+        assert pairwise_collisions(store) == expected
+
+
+def test_fleet_views_share_memory():
+    ellipses = _ellipses(5, "1", seed=3)
+    with GeometryStore.create(ellipses) as store:
+        fleet = store.fleet()
+        for name in ("digits", "h", "k", "a", "b", "vertical"):
+            assert np.shares_memory(getattr(fleet, name), getattr(store, name))
+        assert [vars(fleet.drone(i)) | {"rut": ""} for i in range(5)] == [
+            vars(e) | {"rut": ""} for e in ellipses
+        ]
+
+
+def test_attach_reads_same_geometry():
+    ellipses = _ellipses(4, "2", seed=5)
+    with GeometryStore.create(ellipses) as store:
+        other = GeometryStore.attach(store.handle)
+        try:
+            assert np.array_equal(other.points, store.points)
+            x, y, _ = ellipses[2].generate_points(num_points=200)
+            assert np.array_equal(other.points[2], np.column_stack((x, y)))
+        finally:
+            other.close()
@@ -0,0 +1,55 @@
+import pytest
+
+from app import app
+from services import http_cache
+
+
+URL = "/resultado?rut_list[0]=11.999.999-1&rut_list[1]=12.999.999-2&case_type=1"
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+@pytest.mark.parametrize("encoding", [None, "gzip", "br"])
+def test_same_url_gives_same_bytes_and_etag(client, encoding):
+    if encoding == "br" and http_cache.brotli is None:
+        pytest.skip("brotli no instalado")
+    headers = {"Accept-Encoding": encoding} if encoding else {}
+    first = client.get(URL, headers=headers)
+    second = client.get(URL, headers=headers)
+    assert first.status_code == 200
+    assert first.headers.get("Content-Encoding") == encoding
+    assert first.headers["ETag"] == second.headers["ETag"]
+    assert first.data == second.data
+
+
+def test_etag_differs_per_encoding_and_varies(client):
+    plain = client.get(URL)
+    gzipped = client.get(URL, headers={"Accept-Encoding": "gzip"})
+    assert plain.headers["ETag"] != gzipped.headers["ETag"]
+    assert gzipped.headers["ETag"].endswith('-gzip"')
+    for resp in (plain, gzipped):
+        assert "Accept-Encoding" in resp.headers["Vary"]
+        assert resp.headers["Cache-Control"] == f"public, max-age={http_cache.CACHE_MAX_AGE}"
+
+
+def test_conditional_get_returns_304(client):
+    etag = client.get(URL, headers={"Accept-Encoding": "gzip"}).headers["ETag"]
+    for if_none_match in (etag, "W/" + etag):
+        resp = client.get(URL, headers={"Accept-Encoding": "gzip", "If-None-Match": if_none_match})
+        assert resp.status_code == 304
+        assert resp.data == b""
+        assert resp.headers["ETag"] == etag
+
+
+def test_etag_of_other_encoding_does_not_match(client):
+    etag = client.get(URL, headers={"Accept-Encoding": "gzip"}).headers["ETag"]
+    resp = client.get(URL, headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+
+
+def test_etag_depends_on_probe_budget():
+    ruts = ["11.999.999-1", "12.999.999-2"]
+    assert http_cache.build_etag(ruts, "1", False, 4000) != http_cache.build_etag(ruts, "1", False, 8000)
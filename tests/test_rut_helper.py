@@ -0,0 +1,80 @@
+import numpy as np
+
+from services.rut_helper import extract_first8_digits, parse_ruts_bulk
+
+
+def test_check_digit_eight_digit_body():
+    _, valid, check_ok = parse_ruts_bulk(["12.345.678-5", "12.345.678-4", "11.111.111-1"])
+    assert valid.tolist() == [True, True, True]
+    assert check_ok.tolist() == [True, False, True]
+
+
+def test_check_digit_seven_digit_body():
+    digits, valid, check_ok = parse_ruts_bulk(["1.234.567-4", "1234567-4", "1.234.567-5"])
+    assert digits[0].tolist() == [1, 2, 3, 4, 5, 6, 7, 4]
+    assert valid.tolist() == [True, True, True]
+    assert check_ok.tolist() == [True, True, False]
+
+
+def test_check_digit_k_either_case():
+    _, _, check_ok = parse_ruts_bulk(["20.000.003-K", "20000003k", "1.234.567-K"])
+    assert check_ok.tolist() == [True, True, False]
+
+
+def test_check_digit_without_separator_or_verifier():
+    _, valid, check_ok = parse_ruts_bulk(["123456785", "12345678", "1234"])
+    assert valid.tolist() == [True, True, False]
+    assert check_ok.tolist() == [True, False, False]
+
+
+def test_input_forms_agree():
+    ruts = ["12.345.678-5", "1.234.567-4", "20.000.003-K", "", "abc"]
+    expected = parse_ruts_bulk(ruts)
+    for other in (
+        parse_ruts_bulk("\n".join(ruts).encode()),
+        parse_ruts_bulk(np.array(ruts)),
+        parse_ruts_bulk(np.array([r.encode() for r in ruts])),
+    ):
+        for a, b in zip(expected, other):
+            assert (a == b).all()
+
+
+def test_byte_buffer_input():
+    digits, valid, check_ok = parse_ruts_bulk(b"12345678-5\n1.234.567-4\n99999999-1\n")
+    assert digits.shape == (3, 8)
+    assert digits.dtype == np.uint8
+    assert valid.tolist() == [True, True, True]
+    assert check_ok.tolist() == [True, True, False]
+
+
+def test_empty_input():
+    for ruts in ([], b""):
+        digits, valid, check_ok = parse_ruts_bulk(ruts)
+        assert digits.shape == (0, 8)
+        assert valid.size == 0 and check_ok.size == 0
+
+
+def test_extract_first8_digits_scalar():
+    assert extract_first8_digits("12.345.678-5") == [1, 2, 3, 4, 5, 6, 7, 8]
+    assert extract_first8_digits("12.34") == [1, 2, 3, 4]
+
+
+def test_scalar_and_bulk_agree_on_non_ascii_digits():
+    ruts = ["１２.３４５.６７８-5", "12.345.678-5", "١٢٣٤٥٦٧٨"]
+    digits, valid, _ = parse_ruts_bulk(ruts)
+    for rut, row, ok in zip(ruts, digits, valid):
+        scalar = extract_first8_digits(rut)
+        assert ok == (len(scalar) == 8)
+        if ok:
+            assert row.tolist() == scalar
+
+
+def test_non_ascii_digits_are_rejected_not_500():
+    from app import app
+
+    client = app.test_client()
+    resp = client.get("/resultado?rut_list[0]=１２.３４５.６７８-5&rut_list[1]=11.111.111-1&case_type=1")
+    assert resp.status_code == 302
+    resp = client.post("/", data={"rut_list[]": ["１２.３４５.６７８-5", "11.111.111-1"], "case_type": "1"})
+    assert resp.status_code == 302
+    assert resp.location.endswith("/")
@@ -0,0 +1,44 @@
+import logging
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from core.ellipse_model import Fleet
+from services import static_plot_service
+
+
+@pytest.fixture
+def plots_folder(tmp_path, monkeypatch):
+    monkeypatch.setattr(static_plot_service, "PLOTS_FOLDER", str(tmp_path))
+    monkeypatch.setattr(static_plot_service, "PAGES_FOLDER", str(tmp_path / "pages"))
+    return tmp_path
+
+
+def _drones():
+    return Fleet.from_ruts(["11.999.999-1", "12.999.999-2"], "1").drones()
+
+
+def test_render_failure_is_logged_and_clears_marker(plots_folder, caplog):
+    with caplog.at_level(logging.ERROR, logger=static_plot_service.__name__):
+        # Mathtext inválido: savefig falla dentro del worker
+        filename = static_plot_service.build_2d_image(_drones(), r"$\comandoinexistente$")
+        assert static_plot_service.wait_for_image(filename, timeout=60) is None
+    assert not os.path.exists(os.path.join(plots_folder, filename))
+    assert not os.path.exists(os.path.join(plots_folder, filename + ".pending"))
+    assert filename in caplog.text
+
+
+class _BrokenExecutor:
+    def submit(self, *args, **kwargs):
+        raise BrokenProcessPool("worker muerto")
+
+    def shutdown(self, wait=True):
+        pass
+
+
+def test_broken_pool_is_replaced(plots_folder, monkeypatch):
+    monkeypatch.setattr(static_plot_service, "_executor", _BrokenExecutor())
+    filename = static_plot_service.build_2d_image(_drones(), "Reintento")
+    assert static_plot_service.wait_for_image(filename, timeout=60)
+    assert not isinstance(static_plot_service._executor, _BrokenExecutor)